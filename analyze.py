@@ -3,15 +3,29 @@ Example usage script for the Azure DevOps Security Alert Agent analysis capabili
 """
 
 import argparse
+import functools
 import logging
+import os
 import sys
 import yaml
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
 from src.analysis.query import AlertAnalyzer
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the json module
+    orjson = None
+
+# Prefer the libyaml-backed loader, which is much faster than the pure-Python one
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,11 +38,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_config(config_path, mtime):
+    """Parse a YAML configuration file, cached by path and modification time."""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
 def load_config(config_path):
     """Load configuration from YAML file."""
     try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        return _parse_config(config_path, os.path.getmtime(config_path))
     except Exception as e:
         logger.error(f"Error loading configuration: {e}")
         sys.exit(1)
@@ -46,95 +66,51 @@ def analyze_alerts(config):
     
     if not organization or not project:
         logger.error("Organization and project must be specified in the configuration")
+        analyzer.close()
         return False
     
     # Get repository from config or command line
     repositories = config.get('repositories', [])
     repository = repositories[0] if repositories else None
     
-    # Generate analysis reports
-    reports = {}
-    
-    # Alert counts by severity
-    try:
-        reports['severity_counts'] = analyzer.get_alert_counts_by_severity(
-            organization=organization,
-            project=project,
-            repository=repository
-        )
-        logger.info(f"Alert counts by severity: {reports['severity_counts']}")
-    except Exception as e:
-        logger.error(f"Error getting alert counts by severity: {e}")
-    
-    # Alert counts by state
-    try:
-        reports['state_counts'] = analyzer.get_alert_counts_by_state(
-            organization=organization,
-            project=project,
-            repository=repository
-        )
-        logger.info(f"Alert counts by state: {reports['state_counts']}")
-    except Exception as e:
-        logger.error(f"Error getting alert counts by state: {e}")
-    
-    # Alert counts by type
-    try:
-        reports['type_counts'] = analyzer.get_alert_counts_by_type(
-            organization=organization,
-            project=project,
-            repository=repository
-        )
-        logger.info(f"Alert counts by type: {reports['type_counts']}")
-    except Exception as e:
-        logger.error(f"Error getting alert counts by type: {e}")
-    
-    # Alert trend
-    try:
-        reports['alert_trend'] = analyzer.get_alert_trend(
-            organization=organization,
-            project=project,
-            repository=repository,
-            days=30,
-            interval='day'
-        )
-        logger.info(f"Alert trend: {reports['alert_trend']}")
-    except Exception as e:
-        logger.error(f"Error getting alert trend: {e}")
-    
-    # Top repositories by alerts
-    try:
-        reports['top_repositories'] = analyzer.get_top_repositories_by_alerts(
-            organization=organization,
-            project=project,
-            limit=10
-        )
-        logger.info(f"Top repositories by alerts: {reports['top_repositories']}")
-    except Exception as e:
-        logger.error(f"Error getting top repositories: {e}")
+    # Generate analysis reports. The queries are independent reads, so they
+    # run concurrently, each worker thread using its own connection.
+    common = {'organization': organization, 'project': project}
+    tasks = {
+        'alert_counts': ('alert counts', analyzer.get_alert_counts,
+                         {**common, 'repository': repository}),
+        'alert_trend': ('alert trend', analyzer.get_alert_trend,
+                        {**common, 'repository': repository, 'days': 30, 'interval': 'day'}),
+        'top_repositories': ('top repositories by alerts', analyzer.get_top_repositories_by_alerts,
+                             {**common, 'limit': 10}),
+        'top_rules': ('top rules', analyzer.get_top_rules,
+                      {**common, 'repository': repository, 'limit': 10}),
+        'alerts_by_file': ('alerts by file path', analyzer.get_alerts_by_file_path,
+                           {**common, 'repository': repository, 'limit': 10}),
+    }
+    
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {
+            key: executor.submit(method, **kwargs)
+            for key, (_, method, kwargs) in tasks.items()
+        }
     
-    # Top rules
-    try:
-        reports['top_rules'] = analyzer.get_top_rules(
-            organization=organization,
-            project=project,
-            repository=repository,
-            limit=10
-        )
-        logger.info(f"Top rules: {reports['top_rules']}")
-    except Exception as e:
-        logger.error(f"Error getting top rules: {e}")
+    reports = {}
+    for key, (description, _, _) in tasks.items():
+        try:
+            result = futures[key].result()
+        except Exception as e:
+            logger.error(f"Error getting {description}: {e}")
+            continue
+        
+        # The combined counts query fills the severity, state and type reports
+        if key == 'alert_counts':
+            reports.update(result)
+        else:
+            reports[key] = result
+        logger.info(f"{description.capitalize()}: {result}")
     
-    # Alerts by file path
-    try:
-        reports['alerts_by_file'] = analyzer.get_alerts_by_file_path(
-            organization=organization,
-            project=project,
-            repository=repository,
-            limit=10
-        )
-        logger.info(f"Alerts by file path: {reports['alerts_by_file']}")
-    except Exception as e:
-        logger.error(f"Error getting alerts by file path: {e}")
+    analyzer.close()
     
     # Save reports to file
     try:
@@ -144,8 +120,12 @@ def analyze_alerts(config):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         report_file = reports_dir / f"analysis_report_{timestamp}.json"
         
-        with open(report_file, 'w') as f:
-            json.dump(reports, f, indent=2)
+        if orjson is not None:
+            with open(report_file, 'wb') as f:
+                f.write(orjson.dumps(reports, option=orjson.OPT_INDENT_2))
+        else:
+            with open(report_file, 'w') as f:
+                json.dump(reports, f, indent=2)
         
         logger.info(f"Analysis report saved to {report_file}")
     except Exception as e:
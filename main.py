@@ -3,6 +3,7 @@ Main entry point for the Azure DevOps Security Alert Agent.
 """
 
 import argparse
+import functools
 import logging
 import os
 import sys
@@ -11,9 +12,15 @@ from pathlib import Path
 
 from src.auth.oauth import create_auth_from_config
 from src.api.client import AzureDevOpsClient
-from src.api.models import Alert
+from src.api.models import parse_alerts
 from src.storage.database import AlertDatabase
 
+# Prefer the libyaml-backed loader, which is much faster than the pure-Python one
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,11 +33,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_config(config_path, mtime):
+    """Parse a YAML configuration file, cached by path and modification time."""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
 def load_config(config_path):
     """Load configuration from YAML file."""
     try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        return _parse_config(config_path, os.path.getmtime(config_path))
     except Exception as e:
         logger.error(f"Error loading configuration: {e}")
         sys.exit(1)
@@ -55,49 +68,53 @@ def collect_alerts(config):
     db_path = config.get('database', {}).get('path', 'data/alerts.db')
     db = AlertDatabase(db_path)
     
-    # Get repositories
-    repositories = config.get('repositories', [])
-    if not repositories:
-        logger.info("No repositories specified, fetching all repositories")
-        try:
-            repo_list = client.get_repositories()
-            repositories = [repo.get('name') for repo in repo_list]
-        except Exception as e:
-            logger.error(f"Error fetching repositories: {e}")
-            return False
-    
-    # Collect alerts for each repository
-    total_alerts = 0
-    for repo in repositories:
-        logger.info(f"Collecting alerts for repository: {repo}")
-        try:
-            # Get alerts
-            response = client.get_alerts(repo)
-            if 'error' in response:
-                logger.error(f"Error fetching alerts for {repo}: {response['error']}")
-                continue
-            
-            alerts = response.get('value', [])
-            logger.info(f"Found {len(alerts)} alerts in repository {repo}")
-            
-            # Store alerts
-            for alert_data in alerts:
-                try:
-                    alert = Alert.from_api(alert_data)
-                    db.store_alert(
-                        alert=alert,
-                        organization=config.get('organization', ''),
-                        project=config.get('project', ''),
-                        repository=repo
-                    )
-                    total_alerts += 1
-                except Exception as e:
-                    logger.error(f"Error processing alert: {e}")
-        except Exception as e:
-            logger.error(f"Error collecting alerts for repository {repo}: {e}")
-    
-    logger.info(f"Total alerts collected: {total_alerts}")
-    return True
+    try:
+        # Get repositories
+        repositories = config.get('repositories', [])
+        if not repositories:
+            logger.info("No repositories specified, fetching all repositories")
+            try:
+                repo_list = client.get_repositories()
+                repositories = [repo.get('name') for repo in repo_list]
+            except Exception as e:
+                logger.error(f"Error fetching repositories: {e}")
+                return False
+        
+        # Fetch alerts for all repositories concurrently, then store them
+        logger.info(f"Collecting alerts for {len(repositories)} repositories")
+        responses = client.get_alerts_many(repositories)
+        
+        total_alerts = 0
+        for repo in repositories:
+            logger.info(f"Collecting alerts for repository: {repo}")
+            try:
+                response = responses[repo]
+                if 'error' in response:
+                    logger.error(f"Error fetching alerts for {repo}: {response['error']}")
+                    continue
+                
+                alerts = response.get('value', [])
+                logger.info(f"Found {len(alerts)} alerts in repository {repo}")
+                
+                # Parse alerts, skipping any that fail, then store them in one transaction
+                batch = parse_alerts(alerts)
+                
+                db.store_alerts(
+                    alerts=batch,
+                    organization=config.get('organization', ''),
+                    project=config.get('project', ''),
+                    repository=repo
+                )
+                total_alerts += len(batch)
+            except Exception as e:
+                logger.error(f"Error collecting alerts for repository {repo}: {e}")
+        
+        logger.info(f"Total alerts collected: {total_alerts}")
+        return True
+    finally:
+        client.close()
+        auth_provider.close()
+        db.close()
 
 
 def main():
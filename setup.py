@@ -0,0 +1,34 @@
+"""
+Optional compiled build for the Azure DevOps Security Alert Agent.
+
+Compiles the API data models with Cython to speed up alert parsing:
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+The extension is built next to src/api/models.py and is imported in its
+place. Without it (or without Cython) the pure-Python module is used. As
+long as the extension is there, edits to models.py have no effect: rebuild
+it, or delete the src/api/models.*.so file, after changing models.py.
+
+Annotation typing is disabled so annotations such as ``data: Dict`` stay
+hints, as in the interpreted module, instead of requiring an exact dict.
+"""
+
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [Extension("src.api.models", ["src/api/models.py"])],
+        language_level=3,
+        compiler_directives={"annotation_typing": False}
+    )
+
+setup(
+    name="azure-devops-security-agent",
+    ext_modules=ext_modules
+)
@@ -2,14 +2,108 @@
 Analysis module for Azure DevOps Advanced Security alerts.
 """
 
+import functools
 import logging
+import os
 import sqlite3
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 import json
 
 logger = logging.getLogger(__name__)
 
+# Display order for severities; anything else sorts after these
+_SEVERITY_ORDER = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+
+def _by_severity(counts: Iterable[Tuple[str, int]]) -> Dict[str, int]:
+    """Order (severity, count) pairs from critical to low, unknown severities last."""
+    return dict(sorted(
+        counts,
+        key=lambda item: (_SEVERITY_ORDER.get(item[0], len(_SEVERITY_ORDER)), item[0])
+    ))
+
+
+def _repository_variants(query: str, tail: str, column: str = 'repository') -> Tuple[str, str]:
+    """
+    Build the SQL text of a query without and with a repository filter.
+    
+    Index the result with bool(repository) to pick the variant. Building the
+    text once keeps it byte-identical across calls, so SQLite's statement cache
+    can reuse the prepared statement.
+    """
+    return query + tail, f"{query} AND {column} = ?{tail}"
+
+
+def _trend_variants(date_format: str) -> Tuple[str, str]:
+    """Build the alert trend query variants for a strftime date format."""
+    return _repository_variants(f'''
+        SELECT
+            strftime('{date_format}', first_seen_date) as period,
+            COUNT(*) as count
+        FROM alerts
+        WHERE organization = ? AND project = ? AND first_seen_date >= strftime('%Y-%m-%dT%H:%M:%S', 'now', ?)
+        ''', f" GROUP BY strftime('{date_format}', first_seen_date) ORDER BY period")
+
+
+# Alert trend query text keyed by (interval, bool(repository))
+_TREND_SQL = {
+    (interval, filtered): query
+    for interval, date_format in (('day', '%Y-%m-%d'), ('week', '%Y-%W'), ('month', '%Y-%m'))
+    for filtered, query in zip((False, True), _trend_variants(date_format))
+}
+
+
+def _rows_as_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+    """
+    Convert a cursor's tuple rows to dicts, resolving column names once.
+    
+    Rows are consumed straight from the cursor rather than via fetchall(), so
+    the result is not materialized twice.
+    """
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+
+def _memoized(method):
+    """
+    Cache a query method's result until the database changes on disk.
+    
+    Results are keyed on the method name and its arguments and are dropped as
+    soon as the modification time of the database (or its WAL file) changes.
+    Cached results are shared between callers and must not be mutated.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (
+            method.__name__,
+            tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args),
+            tuple(sorted(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in kwargs.items()
+            )),
+        )
+        mtime = self._db_mtime()
+        if mtime is None:
+            return method(self, *args, **kwargs)
+        
+        with self._cache_lock:
+            if mtime != self._cache_mtime:
+                self._cache.clear()
+                self._cache_mtime = mtime
+            elif key in self._cache:
+                return self._cache[key]
+        
+        result = method(self, *args, **kwargs)
+        
+        with self._cache_lock:
+            if mtime == self._cache_mtime:
+                self._cache[key] = result
+        return result
+    
+    return wrapper
+
 
 class AlertAnalyzer:
     """
@@ -19,15 +113,222 @@ class AlertAnalyzer:
     including filtering, grouping, and trend analysis.
     """
     
-    def __init__(self, db_path: str):
+    # Prepared query text; pairs built by _repository_variants are indexed
+    # with bool(repository)
+    _QUERIES = {
+        'severity': _repository_variants('''
+        SELECT severity, COUNT(*) as count
+        FROM alerts
+        WHERE organization = ? AND project = ? AND last_seen_date >= strftime('%Y-%m-%dT%H:%M:%S', 'now', ?)
+        ''', ' GROUP BY severity'),
+        'state': _repository_variants('''
+        SELECT state, SUM(count) as count
+        FROM alert_counts
+        WHERE organization = ? AND project = ?
+        ''', ' GROUP BY state'),
+        'state_scan': _repository_variants('''
+        SELECT state, COUNT(*) as count
+        FROM alerts
+        WHERE organization = ? AND project = ?
+        ''', ' GROUP BY state'),
+        'type': _repository_variants('''
+        SELECT alert_type, SUM(count) as count
+        FROM alert_counts
+        WHERE organization = ? AND project = ?
+        ''', ' GROUP BY alert_type'),
+        'type_scan': _repository_variants('''
+        SELECT alert_type, COUNT(*) as count
+        FROM alerts
+        WHERE organization = ? AND project = ?
+        ''', ' GROUP BY alert_type'),
+        'buckets': _repository_variants('''
+        SELECT state, alert_type, SUM(count) as count
+        FROM alert_counts
+        WHERE organization = ? AND project = ?
+        ''', ' GROUP BY state, alert_type'),
+        'counts': _repository_variants('''
+        SELECT severity, state, alert_type, last_seen_date >= strftime('%Y-%m-%dT%H:%M:%S', 'now', ?) as recent, COUNT(*) as count
+        FROM alerts
+        WHERE organization = ? AND project = ?
+        ''', ' GROUP BY severity, state, alert_type, recent'),
+        'top_repositories': '''
+        SELECT repository, COUNT(*) as count
+        FROM alerts
+        WHERE organization = ? AND project = ?
+        ''',
+        'top_rules': _repository_variants('''
+        SELECT rule_id, rule_name, COUNT(*) as count
+        FROM alerts
+        WHERE organization = ? AND project = ? AND rule_id IS NOT NULL
+        ''', ' GROUP BY rule_id, rule_name ORDER BY count DESC LIMIT ?'),
+        'file_paths': _repository_variants('''
+        SELECT pl.file_path, COUNT(*) as count
+        FROM physical_locations pl
+        WHERE pl.alert_id IN (
+            SELECT id FROM alerts
+            WHERE organization = ? AND project = ?''', '''
+        )
+        GROUP BY pl.file_path ORDER BY count DESC LIMIT ?'''),
+        'alert_details': '''
+        SELECT *,
+               NULLIF(json_extract(CAST(raw_data AS TEXT), '$.additional_properties'), '{}') AS additional_properties_json
+        FROM alerts
+        WHERE organization = ? AND project = ? AND repository = ? AND alert_id = ?
+        ''',
+        'physical_locations': 'SELECT file_path, start_line, end_line, start_column, end_column FROM physical_locations WHERE alert_id = ?',
+        'logical_locations': 'SELECT name, kind FROM logical_locations WHERE alert_id = ?',
+        'search': _repository_variants('''
+        SELECT a.id, a.alert_id, a.repository, a.alert_type, a.severity, a.state,
+               a.first_seen_date, a.last_seen_date, a.rule_name
+        FROM alerts a
+        WHERE a.organization = ? AND a.project = ?
+        AND (
+            a.id IN (SELECT rowid FROM alerts_fts WHERE alerts_fts MATCH ?) OR
+            a.id IN (
+                SELECT pl.alert_id FROM physical_locations pl
+                WHERE pl.id IN (SELECT rowid FROM location_fts WHERE location_fts MATCH ?)
+            )
+        )
+        ''', ' ORDER BY a.id LIMIT ?', column='a.repository'),
+        'search_like': _repository_variants('''
+        SELECT a.id, a.alert_id, a.repository, a.alert_type, a.severity, a.state,
+               a.first_seen_date, a.last_seen_date, a.rule_name
+        FROM alerts a
+        LEFT JOIN physical_locations pl ON a.id = pl.alert_id
+        WHERE a.organization = ? AND a.project = ?
+        AND (
+            a.rule_name LIKE ? OR
+            pl.file_path LIKE ? OR
+            CAST(a.raw_data AS TEXT) LIKE ?
+        )
+        ''', ' GROUP BY a.id LIMIT ?', column='a.repository'),
+    }
+    
+    def __init__(self, db_path: str, readonly: bool = True):
         """
         Initialize the analyzer with a database connection.
         
+        The indexes, alert_counts and alerts_fts are created by AlertDatabase,
+        which owns the schema; the analyzer never writes to the database. On a
+        database without the derived tables, counts and search fall back to
+        scanning alerts.
+        
         Args:
             db_path: Path to the SQLite database file
+            readonly: Open the query connections read-only
         """
         self.db_path = db_path
+        self.readonly = readonly
+        self._cache: Dict[tuple, Any] = {}
+        self._cache_mtime: Optional[Tuple[int, int]] = None
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        
+        derived = {
+            name for (name,) in self._execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name IN ('alerts_fts', 'location_fts', 'alert_counts')", []
+            )
+        }
+        self._fts_available = {'alerts_fts', 'location_fts'} <= derived
+        self._counts_available = 'alert_counts' in derived
+    
+    def _open_connection(self, readonly: bool) -> sqlite3.Connection:
+        """
+        Open a configured connection to the database.
+        
+        Read-only connections use a mode=ro URI, so SQLite never takes a write
+        lock or sets up a journal for them.
+        
+        Args:
+            readonly: Whether to open the database read-only
+            
+        Returns:
+            sqlite3.Connection: The new connection
+        """
+        if readonly:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        self._configure_connection(conn, readonly)
+        return conn
+    
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the connection for the calling thread, opening it on first use.
+        
+        WAL mode lets each thread read through its own connection concurrently.
+        
+        Returns:
+            sqlite3.Connection: Connection owned by the current thread
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open_connection(self.readonly)
+            with self._connections_lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
     
+    def _execute(self, query: str, params: List) -> sqlite3.Cursor:
+        """
+        Execute a query on the calling thread's connection.
+        
+        Rows come back as plain tuples rather than sqlite3.Row, which avoids a
+        name lookup per column access on the hot aggregation paths.
+        
+        Args:
+            query: SQL text to execute
+            params: Query parameters
+            
+        Returns:
+            sqlite3.Cursor: Cursor positioned on the results
+        """
+        cursor = self._connection().cursor()
+        cursor.row_factory = None
+        return cursor.execute(query, params)
+    
+    @staticmethod
+    def _configure_connection(conn: sqlite3.Connection, readonly: bool = False):
+        """Apply the PRAGMAs used for analytic reads on a connection."""
+        if not readonly:
+            # Persistent; read-only connections pick it up from the file
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+    
+    def _db_mtime(self) -> Optional[Tuple[int, int]]:
+        """
+        Get the modification times of the database and its WAL file.
+        
+        Returns:
+            Optional[Tuple[int, int]]: Modification times in nanoseconds, or None
+            if the database is not a file on disk
+        """
+        try:
+            db_mtime = os.stat(self.db_path).st_mtime_ns
+        except OSError:
+            return None
+        try:
+            wal_mtime = os.stat(f"{self.db_path}-wal").st_mtime_ns
+        except OSError:
+            wal_mtime = 0
+        return db_mtime, wal_mtime
+    
+    def close(self):
+        """Close every database connection opened by the analyzer."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+    
+    @_memoized
     def get_alert_counts_by_severity(self, organization: str, project: str, 
                                     repository: Optional[str] = None,
                                     days: int = 30) -> Dict[str, int]:
@@ -43,33 +344,17 @@ class AlertAnalyzer:
         Returns:
             Dict[str, int]: Counts of alerts by severity
         """
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        query = '''
-        SELECT severity, COUNT(*) as count
-        FROM alerts
-        WHERE organization = ? AND project = ? AND last_seen_date >= ?
-        '''
-        params = [organization, project, cutoff_date]
+        cutoff = f'-{days} days'
         
+        params = [organization, project, cutoff]
         if repository:
-            query += ' AND repository = ?'
             params.append(repository)
         
-        query += ''' GROUP BY severity ORDER BY CASE severity 
-                  WHEN "critical" THEN 1 
-                  WHEN "high" THEN 2 
-                  WHEN "medium" THEN 3 
-                  WHEN "low" THEN 4 
-                  ELSE 5 END'''
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            return {row['severity']: row['count'] for row in cursor.fetchall()}
+        cursor = self._execute(self._QUERIES['severity'][bool(repository)], params)
+        
+        return _by_severity(cursor.fetchall())
     
+    @_memoized
     def get_alert_counts_by_state(self, organization: str, project: str,
                                  repository: Optional[str] = None) -> Dict[str, int]:
         """
@@ -83,26 +368,16 @@ class AlertAnalyzer:
         Returns:
             Dict[str, int]: Counts of alerts by state
         """
-        query = '''
-        SELECT state, COUNT(*) as count
-        FROM alerts
-        WHERE organization = ? AND project = ?
-        '''
         params = [organization, project]
-        
         if repository:
-            query += ' AND repository = ?'
             params.append(repository)
         
-        query += ' GROUP BY state'
+        query = self._QUERIES['state' if self._counts_available else 'state_scan']
+        cursor = self._execute(query[bool(repository)], params)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            return {row['state']: row['count'] for row in cursor.fetchall()}
+        return dict(cursor.fetchall())
     
+    @_memoized
     def get_alert_counts_by_type(self, organization: str, project: str,
                                repository: Optional[str] = None) -> Dict[str, int]:
         """
@@ -116,26 +391,79 @@ class AlertAnalyzer:
         Returns:
             Dict[str, int]: Counts of alerts by type
         """
-        query = '''
-        SELECT alert_type, COUNT(*) as count
-        FROM alerts
-        WHERE organization = ? AND project = ?
-        '''
         params = [organization, project]
-        
         if repository:
-            query += ' AND repository = ?'
             params.append(repository)
         
-        query += ' GROUP BY alert_type'
+        query = self._QUERIES['type' if self._counts_available else 'type_scan']
+        cursor = self._execute(query[bool(repository)], params)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
+        return dict(cursor.fetchall())
+    
+    @_memoized
+    def get_alert_counts(self, organization: str, project: str,
+                         repository: Optional[str] = None,
+                         days: int = 30) -> Dict[str, Dict[str, int]]:
+        """
+        Get alert counts by severity, state and type.
+        
+        Equivalent to calling get_alert_counts_by_severity, get_alert_counts_by_state
+        and get_alert_counts_by_type. With the alert_counts summary, state and
+        type are summed from its bucket rows and only the recent severity counts
+        read alerts; without it, the three groupings are folded from one GROUP BY
+        over their combined key.
+        
+        Args:
+            organization: Azure DevOps organization
+            project: Azure DevOps project
+            repository: Optional repository name or ID
+            days: Number of days to look back for the severity counts
+            
+        Returns:
+            Dict[str, Dict[str, int]]: Counts keyed by 'severity_counts',
+            'state_counts' and 'type_counts'
+        """
+        cutoff = f'-{days} days'
+        filtered = bool(repository)
+        
+        severity_counts: Dict[str, int] = {}
+        state_counts: Dict[str, int] = {}
+        type_counts: Dict[str, int] = {}
+        if self._counts_available:
+            # State and type come from the alert_counts buckets; only the
+            # severity counts, limited to recent alerts, still read alerts
+            severity_params = [organization, project, cutoff]
+            bucket_params = [organization, project]
+            if filtered:
+                severity_params.append(repository)
+                bucket_params.append(repository)
             
-            return {row['alert_type']: row['count'] for row in cursor.fetchall()}
+            cursor = self._execute(self._QUERIES['severity'][filtered], severity_params)
+            severity_counts = dict(cursor.fetchall())
+            
+            cursor = self._execute(self._QUERIES['buckets'][filtered], bucket_params)
+            for state, alert_type, count in cursor.fetchall():
+                state_counts[state] = state_counts.get(state, 0) + count
+                type_counts[alert_type] = type_counts.get(alert_type, 0) + count
+        else:
+            params = [cutoff, organization, project]
+            if filtered:
+                params.append(repository)
+            
+            cursor = self._execute(self._QUERIES['counts'][filtered], params)
+            for severity, state, alert_type, recent, count in cursor.fetchall():
+                if recent:
+                    severity_counts[severity] = severity_counts.get(severity, 0) + count
+                state_counts[state] = state_counts.get(state, 0) + count
+                type_counts[alert_type] = type_counts.get(alert_type, 0) + count
+        
+        return {
+            'severity_counts': _by_severity(severity_counts.items()),
+            'state_counts': dict(sorted(state_counts.items())),
+            'type_counts': dict(sorted(type_counts.items())),
+        }
     
+    @_memoized
     def get_alert_trend(self, organization: str, project: str,
                       repository: Optional[str] = None,
                       days: int = 30,
@@ -153,40 +481,20 @@ class AlertAnalyzer:
         Returns:
             List[Dict]: Alert counts over time
         """
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        # SQLite date format
-        if interval == 'day':
-            date_format = '%Y-%m-%d'
-        elif interval == 'week':
-            date_format = '%Y-%W'
-        elif interval == 'month':
-            date_format = '%Y-%m'
-        else:
-            date_format = '%Y-%m-%d'
+        cutoff = f'-{days} days'
         
-        query = f'''
-        SELECT 
-            strftime('{date_format}', first_seen_date) as period,
-            COUNT(*) as count
-        FROM alerts
-        WHERE organization = ? AND project = ? AND first_seen_date >= ?
-        '''
-        params = [organization, project, cutoff_date]
+        # Unknown intervals fall back to daily buckets
+        query = _TREND_SQL.get((interval, bool(repository))) or _TREND_SQL['day', bool(repository)]
         
+        params = [organization, project, cutoff]
         if repository:
-            query += ' AND repository = ?'
             params.append(repository)
         
-        query += f' GROUP BY strftime(\'{date_format}\', first_seen_date) ORDER BY period'
+        cursor = self._execute(query, params)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            return [dict(row) for row in cursor.fetchall()]
+        return _rows_as_dicts(cursor)
     
+    @_memoized
     def get_top_repositories_by_alerts(self, organization: str, project: str,
                                      severity: Optional[List[str]] = None,
                                      limit: int = 10) -> List[Dict]:
@@ -202,11 +510,7 @@ class AlertAnalyzer:
         Returns:
             List[Dict]: Repositories with alert counts
         """
-        query = '''
-        SELECT repository, COUNT(*) as count
-        FROM alerts
-        WHERE organization = ? AND project = ?
-        '''
+        query = self._QUERIES['top_repositories']
         params = [organization, project]
         
         if severity:
@@ -217,13 +521,11 @@ class AlertAnalyzer:
         query += ' GROUP BY repository ORDER BY count DESC LIMIT ?'
         params.append(limit)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            return [dict(row) for row in cursor.fetchall()]
+        cursor = self._execute(query, params)
+        
+        return _rows_as_dicts(cursor)
     
+    @_memoized
     def get_top_rules(self, organization: str, project: str,
                     repository: Optional[str] = None,
                     limit: int = 10) -> List[Dict]:
@@ -239,27 +541,16 @@ class AlertAnalyzer:
         Returns:
             List[Dict]: Rules with alert counts
         """
-        query = '''
-        SELECT rule_id, rule_name, COUNT(*) as count
-        FROM alerts
-        WHERE organization = ? AND project = ? AND rule_id IS NOT NULL
-        '''
         params = [organization, project]
-        
         if repository:
-            query += ' AND repository = ?'
             params.append(repository)
-        
-        query += ' GROUP BY rule_id, rule_name ORDER BY count DESC LIMIT ?'
         params.append(limit)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            return [dict(row) for row in cursor.fetchall()]
+        cursor = self._execute(self._QUERIES['top_rules'][bool(repository)], params)
+        
+        return _rows_as_dicts(cursor)
     
+    @_memoized
     def get_alerts_by_file_path(self, organization: str, project: str,
                               repository: Optional[str] = None,
                               limit: int = 100) -> List[Dict]:
@@ -275,28 +566,16 @@ class AlertAnalyzer:
         Returns:
             List[Dict]: File paths with alert counts
         """
-        query = '''
-        SELECT pl.file_path, COUNT(*) as count
-        FROM alerts a
-        JOIN physical_locations pl ON a.id = pl.alert_id
-        WHERE a.organization = ? AND a.project = ?
-        '''
         params = [organization, project]
-        
         if repository:
-            query += ' AND a.repository = ?'
             params.append(repository)
-        
-        query += ' GROUP BY pl.file_path ORDER BY count DESC LIMIT ?'
         params.append(limit)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            return [dict(row) for row in cursor.fetchall()]
+        cursor = self._execute(self._QUERIES['file_paths'][bool(repository)], params)
+        
+        return _rows_as_dicts(cursor)
     
+    @_memoized
     def get_alert_details(self, organization: str, project: str, repository: str, alert_id: int) -> Optional[Dict]:
         """
         Get detailed information for a specific alert.
@@ -308,42 +587,34 @@ class AlertAnalyzer:
             alert_id: ID of the alert
             
         Returns:
-            Optional[Dict]: Alert details or None if not found
+            Optional[Dict]: Alert details, with raw_data decoded, or None if not found
         """
-        query = '''
-        SELECT *
-        FROM alerts
-        WHERE organization = ? AND project = ? AND repository = ? AND alert_id = ?
-        '''
         params = [organization, project, repository, alert_id]
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            row = cursor.fetchone()
-            if not row:
-                return None
-            
-            alert = dict(row)
-            
-            # Get physical locations
-            cursor.execute(
-                'SELECT file_path, start_line, end_line, start_column, end_column FROM physical_locations WHERE alert_id = ?',
-                (row['id'],)
-            )
-            alert['physical_locations'] = [dict(loc) for loc in cursor.fetchall()]
-            
-            # Get logical locations
-            cursor.execute(
-                'SELECT name, kind FROM logical_locations WHERE alert_id = ?',
-                (row['id'],)
-            )
-            alert['logical_locations'] = [dict(loc) for loc in cursor.fetchall()]
-            
-            return alert
+        cursor = self._connection().execute(self._QUERIES['alert_details'], params)
+        
+        row = cursor.fetchone()
+        if not row:
+            return None
+        
+        alert = dict(row)
+        # additional_properties lives inside raw_data; databases created before
+        # it stopped being stored separately still have a stale plain column
+        alert['additional_properties'] = alert.pop('additional_properties_json')
+        if alert['raw_data']:
+            alert['raw_data'] = json.loads(alert['raw_data'])
+        
+        # Get physical locations
+        cursor.execute(self._QUERIES['physical_locations'], (row['id'],))
+        alert['physical_locations'] = [dict(loc) for loc in cursor.fetchall()]
+        
+        # Get logical locations
+        cursor.execute(self._QUERIES['logical_locations'], (row['id'],))
+        alert['logical_locations'] = [dict(loc) for loc in cursor.fetchall()]
+        
+        return alert
     
+    @_memoized
     def search_alerts(self, organization: str, project: str,
                     query: str,
                     repository: Optional[str] = None,
@@ -361,32 +632,21 @@ class AlertAnalyzer:
         Returns:
             List[Dict]: Matching alerts
         """
-        search_term = f"%{query}%"
-        
-        sql_query = '''
-        SELECT a.id, a.alert_id, a.repository, a.alert_type, a.severity, a.state,
-               a.first_seen_date, a.last_seen_date, a.rule_name
-        FROM alerts a
-        LEFT JOIN physical_locations pl ON a.id = pl.alert_id
-        WHERE a.organization = ? AND a.project = ?
-        AND (
-            a.rule_name LIKE ? OR
-            pl.file_path LIKE ? OR
-            a.raw_data LIKE ?
-        )
-        '''
-        params = [organization, project, search_term, search_term, search_term]
+        # The trigram index only matches terms of three or more characters
+        if self._fts_available and len(query) >= 3:
+            sql_query = self._QUERIES['search'][bool(repository)]
+            # Quote the term as an FTS5 phrase so operators in it are literal
+            phrase = '"' + query.replace('"', '""') + '"'
+            params = [organization, project, phrase, phrase]
+        else:
+            sql_query = self._QUERIES['search_like'][bool(repository)]
+            search_term = f"%{query}%"
+            params = [organization, project, search_term, search_term, search_term]
         
         if repository:
-            sql_query += ' AND a.repository = ?'
             params.append(repository)
-        
-        sql_query += ' GROUP BY a.id LIMIT ?'
         params.append(limit)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(sql_query, params)
-            
-            return [dict(row) for row in cursor.fetchall()]
+        cursor = self._execute(sql_query, params)
+        
+        return _rows_as_dicts(cursor)
@@ -2,13 +2,42 @@
 API client for Azure DevOps Advanced Security alerts.
 """
 
+import json
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts in seconds for API requests
+REQUEST_TIMEOUT = (5, 60)
+
+
+def _decode_json(response: requests.Response) -> Any:
+    """
+    Decode a JSON response body.
+    
+    The body is parsed straight from the buffered bytes rather than through
+    response.text, so no decoded str copy of a large page is held alongside
+    them. orjson is used when installed as it is considerably faster than
+    the stdlib parser.
+    
+    Raises:
+        ValueError: If the body is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return json.loads(response.content)
+
 
 class AzureDevOpsClient:
     """
@@ -29,6 +58,29 @@ class AzureDevOpsClient:
         self.auth_provider = auth_provider
         self.base_url = f"https://advsec.dev.azure.com/{quote(organization)}/{quote(project)}/_apis"
         self.api_version = "7.2-preview.1"
+        self._session = self._create_session()
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """
+        Create a pooled HTTP session that keeps connections alive between calls.
+        
+        Returns:
+            requests.Session: Session with connection pooling and retries
+        """
+        session = requests.Session()
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"]
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry))
+        return session
+    
+    def close(self):
+        """Close the underlying HTTP session."""
+        self._session.close()
     
     def get_alerts(self, repository: str, **kwargs) -> Dict:
         """
@@ -49,16 +101,46 @@ class AzureDevOpsClient:
             if key.startswith("criteria."):
                 params[key] = value
         
-        headers = self.auth_provider.get_auth_header()
-        
         try:
-            response = requests.get(url, headers=headers, params=params)
+            headers = self.auth_provider.get_auth_header()
+            response = self._session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return _decode_json(response)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Error fetching alerts: {e}")
             return {"error": str(e)}
     
+    def get_alerts_many(self, repositories: List[str], max_workers: int = 16, **kwargs) -> Dict[str, Dict]:
+        """
+        Get alerts for several repositories concurrently.
+        
+        Requests are issued from a thread pool over the shared session, so the
+        network round-trips for different repositories overlap.
+        
+        Args:
+            repositories: Repository names or IDs
+            max_workers: Maximum number of concurrent requests
+            **kwargs: Optional filter parameters passed to get_alerts
+            
+        Returns:
+            Dict[str, Dict]: Response for each repository, keyed by repository;
+                a repository whose fetch failed maps to {"error": ...}
+        """
+        if not repositories:
+            return {}
+        
+        def fetch(repo):
+            # One bad repository (e.g. a missing name) must not fail the batch
+            try:
+                return self.get_alerts(repo, **kwargs)
+            except Exception as e:
+                logger.error(f"Error fetching alerts for repository {repo}: {e}")
+                return {"error": str(e)}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(repositories))) as executor:
+            responses = executor.map(fetch, repositories)
+            return dict(zip(repositories, responses))
+    
     def get_alert(self, repository: str, alert_id: int) -> Dict:
         """
         Get a specific alert by ID.
@@ -72,13 +154,12 @@ class AzureDevOpsClient:
         """
         url = f"{self.base_url}/alert/repositories/{quote(repository)}/alerts/{alert_id}"
         params = {"api-version": self.api_version}
-        headers = self.auth_provider.get_auth_header()
-        
         try:
-            response = requests.get(url, headers=headers, params=params)
+            headers = self.auth_provider.get_auth_header()
+            response = self._session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return _decode_json(response)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Error fetching alert {alert_id}: {e}")
             return {"error": str(e)}
     
@@ -91,12 +172,11 @@ class AzureDevOpsClient:
         """
         url = f"https://dev.azure.com/{quote(self.organization)}/{quote(self.project)}/_apis/git/repositories"
         params = {"api-version": "7.2-preview.1"}
-        headers = self.auth_provider.get_auth_header()
-        
         try:
-            response = requests.get(url, headers=headers, params=params)
+            headers = self.auth_provider.get_auth_header()
+            response = self._session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            return response.json().get("value", [])
-        except requests.exceptions.RequestException as e:
+            return _decode_json(response).get("value", [])
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Error fetching repositories: {e}")
             return []
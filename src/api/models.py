@@ -2,11 +2,16 @@
 Data models for Azure DevOps Advanced Security alerts.
 """
 
+import functools
+import logging
+import sys
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Dict, List, Optional, Any
 
+logger = logging.getLogger(__name__)
+
 
 class AlertType(str, Enum):
     """Alert types in Azure DevOps Advanced Security."""
@@ -44,7 +49,33 @@ class AlertState(str, Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+# Value-to-member tables; a dict lookup skips the Enum call machinery on the
+# per-alert construction path
+_ALERT_TYPES = {member.value: member for member in AlertType}
+_CONFIDENCES = {member.value: member for member in Confidence}
+_SEVERITIES = {member.value: member for member in Severity}
+_ALERT_STATES = {member.value: member for member in AlertState}
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an API timestamp into an aware UTC datetime; None if empty.
+    
+    The API marks UTC with a trailing 'Z'. Timestamps without an offset are
+    taken to be UTC, so every stored timestamp has the same form and sorts
+    correctly as text.
+    """
+    if not value:
+        return None
+    if value[-1] == "Z":
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+@dataclass(slots=True)
 class PhysicalLocation:
     """Physical location in source code where an issue was found."""
     file_path: str
@@ -56,8 +87,10 @@ class PhysicalLocation:
     @classmethod
     def from_api(cls, data: Dict) -> 'PhysicalLocation':
         """Create from API response data."""
+        # Alerts of a repository point into the same files over and over
+        file_path = data.get("filePath", "")
         return cls(
-            file_path=data.get("filePath", ""),
+            file_path=sys.intern(file_path) if file_path else file_path,
             start_line=data.get("startLine"),
             end_line=data.get("endLine"),
             start_column=data.get("startColumn"),
@@ -65,7 +98,7 @@ class PhysicalLocation:
         )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LogicalLocation:
     """Logical location for an alert (e.g., component)."""
     name: str
@@ -73,14 +106,14 @@ class LogicalLocation:
     
     @classmethod
     def from_api(cls, data: Dict) -> 'LogicalLocation':
-        """Create from API response data."""
-        return cls(
-            name=data.get("name", ""),
-            kind=data.get("kind")
-        )
+        """Create from API response data, sharing one instance per distinct location."""
+        return _shared_logical_location(data.get("name", ""), data.get("kind"))
 
 
-@dataclass
+_shared_logical_location = functools.lru_cache(maxsize=4096)(LogicalLocation)
+
+
+@dataclass(slots=True, frozen=True)
 class Rule:
     """Analysis rule that caused an alert."""
     id: str
@@ -89,15 +122,16 @@ class Rule:
     
     @classmethod
     def from_api(cls, data: Dict) -> 'Rule':
-        """Create from API response data."""
-        return cls(
-            id=data.get("id", ""),
-            name=data.get("name", ""),
-            description=data.get("description")
-        )
+        """Create from API response data, sharing one instance per distinct rule."""
+        return _shared_rule(data.get("id", ""), data.get("name", ""), data.get("description"))
+
 
+# The alerts of a page repeat a handful of rules and tools; being frozen,
+# equal instances can be shared instead of allocated per alert
+_shared_rule = functools.lru_cache(maxsize=1024)(Rule)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Tool:
     """Analysis tool that generated a security alert."""
     name: str
@@ -105,14 +139,14 @@ class Tool:
     
     @classmethod
     def from_api(cls, data: Dict) -> 'Tool':
-        """Create from API response data."""
-        return cls(
-            name=data.get("name", ""),
-            version=data.get("version")
-        )
+        """Create from API response data, sharing one instance per distinct tool."""
+        return _shared_tool(data.get("name", ""), data.get("version"))
+
+
+_shared_tool = functools.lru_cache(maxsize=64)(Tool)
 
 
-@dataclass
+@dataclass(slots=True)
 class Dismissal:
     """Information about an alert dismissal."""
     type: str
@@ -130,11 +164,11 @@ class Dismissal:
             type=data.get("type", ""),
             comment=data.get("comment"),
             dismissed_by=data.get("dismissedBy", {}).get("displayName"),
-            dismissed_at=datetime.fromisoformat(data.get("dismissedDate")) if data.get("dismissedDate") else None
+            dismissed_at=_parse_iso(data.get("dismissedDate"))
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
     """Azure DevOps Advanced Security alert."""
     alert_id: int
@@ -167,21 +201,49 @@ class Alert:
             # If gitRef is missing, use the repository name as a fallback
             git_ref = f"refs/heads/{data.get('repository', 'main')}"
         
+        rule = data.get("rule")
+        tool = data.get("tool")
+        dismissal = data.get("dismissal")
+        
         return cls(
             alert_id=data.get("alertId", 0),
-            alert_type=AlertType(data.get("alertType", "unknown")),
-            confidence=Confidence(data.get("confidence", "unknown")),
-            severity=Severity(data.get("severity", "unknown")),
-            state=AlertState(data.get("state", "unknown")),
-            first_seen_date=datetime.fromisoformat(data.get("firstSeenDate")) if data.get("firstSeenDate") else datetime.now(),
-            last_seen_date=datetime.fromisoformat(data.get("lastSeenDate")) if data.get("lastSeenDate") else datetime.now(),
-            git_ref=git_ref,
+            alert_type=_ALERT_TYPES.get(data.get("alertType"), AlertType.UNKNOWN),
+            confidence=_CONFIDENCES.get(data.get("confidence"), Confidence.UNKNOWN),
+            severity=_SEVERITIES.get(data.get("severity"), Severity.UNKNOWN),
+            state=_ALERT_STATES.get(data.get("state"), AlertState.UNKNOWN),
+            first_seen_date=_parse_iso(data.get("firstSeenDate")) or datetime.now(timezone.utc),
+            last_seen_date=_parse_iso(data.get("lastSeenDate")) or datetime.now(timezone.utc),
+            git_ref=sys.intern(git_ref),
             physical_locations=[PhysicalLocation.from_api(loc) for loc in physical_locations],
             logical_locations=[LogicalLocation.from_api(loc) for loc in logical_locations],
-            rule=Rule.from_api(data.get("rule", {})) if data.get("rule") else None,
-            tool=Tool.from_api(data.get("tool", {})) if data.get("tool") else None,
-            dismissal=Dismissal.from_api(data.get("dismissal")) if data.get("dismissal") else None,
-            introduced_date=datetime.fromisoformat(data.get("introducedDate")) if data.get("introducedDate") else None,
-            fixed_date=datetime.fromisoformat(data.get("fixedDate")) if data.get("fixedDate") else None,
+            rule=Rule.from_api(rule) if rule else None,
+            tool=Tool.from_api(tool) if tool else None,
+            dismissal=Dismissal.from_api(dismissal) if dismissal else None,
+            introduced_date=_parse_iso(data.get("introducedDate")),
+            fixed_date=_parse_iso(data.get("fixedDate")),
             additional_properties=data.get("additionalProperties", {})
         )
+
+
+def parse_alerts(data: List[Dict]) -> List[Alert]:
+    """
+    Parse a page of API alert records, skipping any that fail to parse.
+    
+    The records are converted in one loop with the constructor bound locally.
+    When this module is compiled with Cython (see setup.py) the loop runs as
+    C code; otherwise it runs as plain Python.
+    
+    Args:
+        data: Alert records from an API response
+        
+    Returns:
+        List[Alert]: The parsed alerts, in input order
+    """
+    from_api = Alert.from_api
+    alerts = []
+    for record in data:
+        try:
+            alerts.append(from_api(record))
+        except Exception as e:
+            logger.error(f"Error processing alert: {e}")
+    return alerts
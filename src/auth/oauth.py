@@ -2,9 +2,26 @@
 Authentication module for Azure DevOps API access.
 """
 
+import base64
 import os
+import threading
+import time
 import requests
 from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Seconds before expiry at which a token is treated as expired and refreshed
+TOKEN_EXPIRY_MARGIN = 60
+
+# Token lifetime in seconds assumed when Azure AD doesn't report expires_in
+DEFAULT_TOKEN_LIFETIME = 3600
+
+# (connect, read) timeouts in seconds for token requests
+TOKEN_REQUEST_TIMEOUT = (3.05, 10)
+
+# Client credentials scope of the Azure DevOps resource
+AZURE_DEVOPS_SCOPE = "499b84ac-1321-427f-aa17-267ca6975798/.default"
 
 
 class OAuthAuthentication:
@@ -27,8 +44,36 @@ class OAuthAuthentication:
         self.client_id = client_id
         self.client_secret = client_secret
         self.tenant_id = tenant_id
+        self.token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
+        self._session = self._create_session()
         self.token = None
+        # time.monotonic() deadline after which the token must be refreshed
         self.token_expiry = None
+        self._token_lock = threading.RLock()
+        self._header = None
+        self._header_token = None
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """
+        Create a pooled HTTP session reused across token refreshes.
+        
+        Returns:
+            requests.Session: Session with connection pooling and retries
+        """
+        session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["POST"]
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+        return session
+    
+    def close(self):
+        """Close the HTTP session used for token requests."""
+        self._session.close()
     
     def get_token(self) -> str:
         """
@@ -41,8 +86,12 @@ class OAuthAuthentication:
         if self._is_token_valid():
             return self.token
         
-        # Otherwise, acquire a new token
-        return self._acquire_token()
+        # Otherwise, acquire a new token. Re-check under the lock so that
+        # threads racing on an expired token trigger a single refresh.
+        with self._token_lock:
+            if self._is_token_valid():
+                return self.token
+            return self._acquire_token()
     
     def _is_token_valid(self) -> bool:
         """
@@ -51,31 +100,67 @@ class OAuthAuthentication:
         Returns:
             bool: True if token is valid, False otherwise
         """
-        # Implementation would check token expiry
-        # For now, always return False to force token acquisition
-        return False
+        with self._token_lock:
+            return self.token is not None and time.monotonic() < self.token_expiry
     
     def _acquire_token(self) -> str:
         """
         Acquire a new access token from Azure AD.
         
+        Uses the client credentials grant over the shared session, so
+        refreshes reuse an open connection to the token endpoint.
+        
         Returns:
             str: The new access token
+            
+        Raises:
+            requests.exceptions.RequestException: If the token request fails
+            ValueError: If Azure AD responds without an access token
+        """
+        response = self._session.post(self.token_url, data={
+            "grant_type": "client_credentials",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "scope": AZURE_DEVOPS_SCOPE,
+        }, timeout=TOKEN_REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        if "access_token" not in data:
+            error = data.get("error_description") or data.get("error") or "no access_token in response"
+            raise ValueError(f"Azure AD token request failed: {error}")
+        return self._set_token(data["access_token"], float(data.get("expires_in", DEFAULT_TOKEN_LIFETIME)))
+    
+    def _set_token(self, token: str, expires_in: float) -> str:
+        """
+        Store a newly acquired token and its expiry deadline.
+        
+        Args:
+            token: The access token
+            expires_in: Token lifetime in seconds, as reported by Azure AD
+            
+        Returns:
+            str: The access token
         """
-        # In a real implementation, this would make an OAuth token request
-        # For now, return a placeholder
-        self.token = "placeholder_oauth_token"
-        return self.token
+        with self._token_lock:
+            self.token = token
+            self.token_expiry = time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN
+        return token
     
     def get_auth_header(self) -> Dict[str, str]:
         """
         Get the authorization header for API requests.
         
+        The header is rebuilt only when the token changes; callers share it
+        and must not modify it.
+        
         Returns:
             Dict[str, str]: The authorization header
         """
         token = self.get_token()
-        return {"Authorization": f"Bearer {token}"}
+        if token is not self._header_token:
+            self._header = {"Authorization": f"Bearer {token}"}
+            self._header_token = token
+        return self._header
 
 
 class PersonalAccessTokenAuth:
@@ -91,17 +176,23 @@ class PersonalAccessTokenAuth:
             pat: The Personal Access Token for Azure DevOps
         """
         self.pat = pat
+        encoded_pat = base64.b64encode(f":{pat}".encode()).decode()
+        self._header = {"Authorization": f"Basic {encoded_pat}"}
     
     def get_auth_header(self) -> Dict[str, str]:
         """
         Get the authorization header for API requests.
         
+        The header is encoded once at construction; callers share it and
+        must not modify it.
+        
         Returns:
             Dict[str, str]: The authorization header
         """
-        import base64
-        encoded_pat = base64.b64encode(f":{self.pat}".encode()).decode()
-        return {"Authorization": f"Basic {encoded_pat}"}
+        return self._header
+    
+    def close(self):
+        """Release resources; a PAT provider holds none."""
 
 
 def create_auth_from_config(config: Dict) -> Optional[object]:
@@ -5,12 +5,20 @@ Database storage for Azure DevOps Advanced Security alerts.
 import sqlite3
 import logging
 import json
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import threading
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Any
 from pathlib import Path
 
 from ..api.models import Alert, AlertType, Confidence, Severity, AlertState
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to json with ComplexEncoder
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,9 +27,10 @@ class ComplexEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, datetime):
             return obj.isoformat()
-        # Handle dataclasses by converting to dict
-        if hasattr(obj, '__dict__'):
-            return obj.__dict__
+        # Handle dataclasses by converting to dict; the models use __slots__, so
+        # read the fields rather than __dict__
+        if is_dataclass(obj):
+            return {f.name: getattr(obj, f.name) for f in fields(obj)}
         # Handle enums
         if isinstance(obj, (AlertType, Confidence, Severity, AlertState)):
             return obj.value
@@ -29,11 +38,127 @@ class ComplexEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def _dumps(obj: Any) -> bytes:
+    """
+    Serialize an alert, or a value taken from one, to UTF-8 encoded JSON.
+    
+    orjson handles dataclasses, enums and datetimes natively, without the
+    Python-level default() callback ComplexEncoder needs for each of them.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, cls=ComplexEncoder).encode()
+
+
+def _loads(data: Any) -> Any:
+    """Deserialize JSON stored as bytes (or as text by older versions)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class AlertDatabase:
     """
     Database for storing and retrieving Azure DevOps Advanced Security alerts.
     """
     
+    # Insert a new alert or update the stored one in place, returning its row
+    # id either way. Updating keeps the row id and created_at, and fires the
+    # UPDATE triggers of derived tables.
+    _UPSERT_ALERT = '''
+    INSERT INTO alerts (
+        alert_id, organization, project, repository,
+        alert_type, confidence, severity, state,
+        first_seen_date, last_seen_date, git_ref,
+        introduced_date, fixed_date,
+        rule_id, rule_name, tool_name,
+        dismissal_type, dismissal_comment, dismissal_by, dismissal_at,
+        raw_data,
+        created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (organization, project, repository, alert_id) DO UPDATE SET
+        alert_type = excluded.alert_type,
+        confidence = excluded.confidence,
+        severity = excluded.severity,
+        state = excluded.state,
+        first_seen_date = excluded.first_seen_date,
+        last_seen_date = excluded.last_seen_date,
+        git_ref = excluded.git_ref,
+        introduced_date = excluded.introduced_date,
+        fixed_date = excluded.fixed_date,
+        rule_id = excluded.rule_id,
+        rule_name = excluded.rule_name,
+        tool_name = excluded.tool_name,
+        dismissal_type = excluded.dismissal_type,
+        dismissal_comment = excluded.dismissal_comment,
+        dismissal_by = excluded.dismissal_by,
+        dismissal_at = excluded.dismissal_at,
+        raw_data = excluded.raw_data,
+        updated_at = excluded.updated_at
+    RETURNING id
+    '''
+    
+    _INSERT_PHYSICAL_LOCATION = '''
+    INSERT INTO physical_locations (
+        alert_id, file_path, start_line, end_line, start_column, end_column
+    ) VALUES (?, ?, ?, ?, ?, ?)
+    '''
+    
+    _INSERT_LOGICAL_LOCATION = '''
+    INSERT INTO logical_locations (
+        alert_id, name, kind
+    ) VALUES (?, ?, ?)
+    '''
+    
+    _DELETE_PHYSICAL_LOCATIONS = 'DELETE FROM physical_locations WHERE alert_id = ?'
+    
+    _DELETE_LOGICAL_LOCATIONS = 'DELETE FROM logical_locations WHERE alert_id = ?'
+    
+    # Moves an alert to its new count bucket. The upsert always sets the bucket
+    # columns, so the WHEN clause skips re-stores that leave them unchanged.
+    _ALERT_COUNTS_UPDATE_TRIGGER = '''
+    CREATE TRIGGER alert_counts_update
+    AFTER UPDATE OF organization, project, repository, state, alert_type, severity ON alerts
+    WHEN old.organization IS NOT new.organization OR old.project IS NOT new.project
+        OR old.repository IS NOT new.repository OR old.state IS NOT new.state
+        OR old.alert_type IS NOT new.alert_type OR old.severity IS NOT new.severity
+    BEGIN
+        UPDATE alert_counts SET count = count - 1
+        WHERE organization = old.organization AND project = old.project AND repository = old.repository
+            AND state = old.state AND alert_type = old.alert_type AND severity = old.severity;
+        DELETE FROM alert_counts
+        WHERE organization = old.organization AND project = old.project AND repository = old.repository
+            AND state = old.state AND alert_type = old.alert_type AND severity = old.severity
+            AND count <= 0;
+        INSERT INTO alert_counts
+        VALUES (new.organization, new.project, new.repository, new.state, new.alert_type, new.severity, 1)
+        ON CONFLICT DO UPDATE SET count = count + 1;
+    END;
+    '''
+    
+    # Base of the get_alerts query; optional filters, ordering and the limit
+    # are appended per call
+    _LIST_ALERTS = '''
+    SELECT id, alert_id, organization, project, repository,
+           alert_type, confidence, severity, state,
+           first_seen_date, last_seen_date, git_ref,
+           introduced_date, fixed_date,
+           rule_id, rule_name, tool_name,
+           dismissal_type, dismissal_comment, dismissal_by, dismissal_at,
+           NULLIF(json_extract(CAST(raw_data AS TEXT), '$.additional_properties'), '{}') AS additional_properties,
+           raw_data, created_at, updated_at,
+           (SELECT json_group_array(json_object(
+                       'file_path', file_path, 'start_line', start_line, 'end_line', end_line,
+                       'start_column', start_column, 'end_column', end_column))
+            FROM (SELECT * FROM physical_locations WHERE alert_id = alerts.id ORDER BY id)
+           ) AS physical_locations_json,
+           (SELECT json_group_array(json_object('name', name, 'kind', kind))
+            FROM (SELECT * FROM logical_locations WHERE alert_id = alerts.id ORDER BY id)
+           ) AS logical_locations_json
+    FROM alerts
+    WHERE organization = ? AND project = ?
+    '''
+    
     def __init__(self, db_path: str):
         """
         Initialize the database connection.
@@ -43,6 +168,9 @@ class AlertDatabase:
         """
         self.db_path = db_path
         self._ensure_db_exists()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._configure_connection(self._conn)
         self._create_tables()
     
     def _ensure_db_exists(self):
@@ -50,9 +178,54 @@ class AlertDatabase:
         db_dir = Path(self.db_path).parent
         db_dir.mkdir(parents=True, exist_ok=True)
     
+    @staticmethod
+    def _configure_connection(conn: sqlite3.Connection):
+        """
+        Apply the PRAGMAs used for the alert store on a connection.
+        
+        WAL turns each commit into roughly one append to the log, and with it
+        synchronous=NORMAL is still durable against application crashes. The
+        larger page cache and memory map keep hot pages out of read syscalls.
+        
+        Args:
+            conn: Connection to configure, before any other statement runs on it
+        """
+        journal_mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        if journal_mode.lower() != 'wal':
+            # e.g. on network file systems, where SQLite refuses WAL
+            logger.debug(f"WAL journal mode unavailable, using {journal_mode}")
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA foreign_keys=ON')
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block in a transaction on the shared connection.
+        
+        The transaction is committed (or rolled back on error) when the block
+        exits, and the lock keeps threads from interleaving transactions. Keep
+        blocks short: an open read transaction pins the WAL snapshot and stops
+        checkpoints from resetting the log, which then grows without bound.
+        
+        Yields:
+            sqlite3.Connection: The database connection
+        """
+        with self._lock, self._conn:
+            yield self._conn
+    
+    def close(self):
+        """Close the database connection, refreshing planner statistics first."""
+        with self._lock:
+            # Re-runs ANALYZE on tables whose contents changed enough to matter
+            self._conn.execute('PRAGMA optimize')
+            self._conn.close()
+    
     def _create_tables(self):
         """Create the necessary database tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
             
             # Create alerts table
@@ -79,8 +252,12 @@ class AlertDatabase:
                 dismissal_comment TEXT,
                 dismissal_by TEXT,
                 dismissal_at TEXT,
-                additional_properties TEXT,
-                raw_data TEXT,
+                -- Derived from raw_data rather than stored a second time; the CAST
+                -- keeps json_extract reading the BLOB as JSON text, not as JSONB
+                additional_properties TEXT GENERATED ALWAYS AS (
+                    NULLIF(json_extract(CAST(raw_data AS TEXT), '$.additional_properties'), '{}')
+                ) VIRTUAL,
+                raw_data BLOB,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
                 UNIQUE(organization, project, repository, alert_id)
@@ -113,12 +290,185 @@ class AlertDatabase:
             ''')
             
             # Create indexes
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_org_proj_repo ON alerts (organization, project, repository)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_alert_id ON alerts (alert_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts (severity)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_state ON alerts (state)')
+            # Rows come out of the index already in get_alerts' order, so
+            # ORDER BY ... LIMIT stops reading once the limit is reached
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_alerts_list '
+                'ON alerts (organization, project, repository, last_seen_date DESC)'
+            )
+            # Prefixes of idx_alerts_list, which serves the same lookups
+            cursor.execute('DROP INDEX IF EXISTS idx_alerts_org_proj_repo')
+            cursor.execute('DROP INDEX IF EXISTS idx_alerts_org_proj_repo_last_seen')
+            # Low-selectivity single-column indexes only slow down writes
+            cursor.execute('DROP INDEX IF EXISTS idx_alerts_severity')
+            cursor.execute('DROP INDEX IF EXISTS idx_alerts_state')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_physical_locations_alert_id ON physical_locations (alert_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_logical_locations_alert_id ON logical_locations (alert_id)')
+            # Used by the analyzer's trend, top rule and file path reports
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_alerts_org_proj_repo_first_seen '
+                'ON alerts (organization, project, repository, first_seen_date)'
+            )
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_org_proj_rule ON alerts (organization, project, rule_id, rule_name)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_physical_locations_file_path ON physical_locations (file_path)')
             
             conn.commit()
+        
+        # Derived tables read by the analyzer; their scripts manage their own
+        # transactions
+        with self._lock:
+            self._create_search_index(self._conn)
+            self._create_count_table(self._conn)
+    
+    @staticmethod
+    def _create_search_index(conn: sqlite3.Connection):
+        """
+        Create the full-text indexes behind the analyzer's search if they don't exist.
+        
+        alerts_fts indexes each alert's rule name and raw data, and location_fts
+        each file path, under a trigram tokenizer, so a phrase MATCH finds the
+        same substrings as LIKE '%term%' through an inverted index. Both are
+        external-content tables over alerts and physical_locations, so the text
+        is not stored a second time. Triggers keep them in sync: a location row
+        only touches its own short entry, and an alert's raw data is indexed
+        again only when it actually changes.
+        
+        Args:
+            conn: Connection to create the indexes through
+        """
+        existing = {
+            name for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name IN ('alerts_fts', 'location_fts')"
+            )
+        }
+        if len(existing) == 2:
+            return
+        
+        try:
+            # Also replaces the earlier single-table layout, whose per-location
+            # triggers rewrote the whole alert entry
+            conn.executescript('''
+            BEGIN;
+            DROP TRIGGER IF EXISTS alerts_fts_location_insert;
+            DROP TRIGGER IF EXISTS alerts_fts_location_delete;
+            DROP TRIGGER IF EXISTS alerts_fts_insert;
+            DROP TRIGGER IF EXISTS alerts_fts_update;
+            DROP TRIGGER IF EXISTS alerts_fts_delete;
+            DROP TABLE IF EXISTS alerts_fts;
+            DROP TABLE IF EXISTS location_fts;
+            CREATE VIRTUAL TABLE alerts_fts USING fts5(
+                rule_name, raw_data,
+                content = 'alerts', content_rowid = 'id', tokenize = 'trigram'
+            );
+            CREATE VIRTUAL TABLE location_fts USING fts5(
+                file_path,
+                content = 'physical_locations', content_rowid = 'id', tokenize = 'trigram'
+            );
+            INSERT INTO alerts_fts (alerts_fts) VALUES ('rebuild');
+            INSERT INTO location_fts (location_fts) VALUES ('rebuild');
+            CREATE TRIGGER alerts_fts_insert AFTER INSERT ON alerts BEGIN
+                INSERT INTO alerts_fts (rowid, rule_name, raw_data)
+                VALUES (new.id, new.rule_name, new.raw_data);
+            END;
+            CREATE TRIGGER alerts_fts_update AFTER UPDATE OF rule_name, raw_data ON alerts
+            WHEN old.rule_name IS NOT new.rule_name OR old.raw_data IS NOT new.raw_data BEGIN
+                INSERT INTO alerts_fts (alerts_fts, rowid, rule_name, raw_data)
+                VALUES ('delete', old.id, old.rule_name, old.raw_data);
+                INSERT INTO alerts_fts (rowid, rule_name, raw_data)
+                VALUES (new.id, new.rule_name, new.raw_data);
+            END;
+            CREATE TRIGGER alerts_fts_delete AFTER DELETE ON alerts BEGIN
+                INSERT INTO alerts_fts (alerts_fts, rowid, rule_name, raw_data)
+                VALUES ('delete', old.id, old.rule_name, old.raw_data);
+            END;
+            CREATE TRIGGER location_fts_insert AFTER INSERT ON physical_locations BEGIN
+                INSERT INTO location_fts (rowid, file_path) VALUES (new.id, new.file_path);
+            END;
+            CREATE TRIGGER location_fts_update AFTER UPDATE OF file_path ON physical_locations
+            WHEN old.file_path IS NOT new.file_path BEGIN
+                INSERT INTO location_fts (location_fts, rowid, file_path)
+                VALUES ('delete', old.id, old.file_path);
+                INSERT INTO location_fts (rowid, file_path) VALUES (new.id, new.file_path);
+            END;
+            CREATE TRIGGER location_fts_delete AFTER DELETE ON physical_locations BEGIN
+                INSERT INTO location_fts (location_fts, rowid, file_path)
+                VALUES ('delete', old.id, old.file_path);
+            END;
+            COMMIT;
+            ''')
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            logger.warning(f"Full-text search unavailable, alert search will use LIKE: {e}")
+    
+    @classmethod
+    def _create_count_table(cls, conn: sqlite3.Connection):
+        """
+        Create the alert_counts summary table if it doesn't exist.
+        
+        alert_counts keeps one row per (organization, project, repository, state,
+        alert_type, severity) bucket with the number of alerts in it. Triggers on
+        alerts maintain it, so the state and type counts read a handful of
+        bucket rows instead of grouping the whole alerts table.
+        
+        Args:
+            conn: Connection to create the table through
+        """
+        if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alert_counts'"
+        ).fetchone():
+            # Databases created before the trigger's WHEN clause still carry the
+            # unconditional version, which rewrites a bucket on every re-store
+            trigger = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'alert_counts_update'"
+            ).fetchone()
+            if trigger and 'WHEN' not in trigger[0]:
+                conn.executescript(
+                    'BEGIN; DROP TRIGGER alert_counts_update;'
+                    + cls._ALERT_COUNTS_UPDATE_TRIGGER + 'COMMIT;'
+                )
+            return
+        
+        try:
+            conn.executescript('''
+            BEGIN;
+            CREATE TABLE alert_counts (
+                organization TEXT NOT NULL,
+                project TEXT NOT NULL,
+                repository TEXT NOT NULL,
+                state TEXT NOT NULL,
+                alert_type TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (organization, project, repository, state, alert_type, severity)
+            ) WITHOUT ROWID;
+            INSERT INTO alert_counts
+                SELECT organization, project, repository, state, alert_type, severity, COUNT(*)
+                FROM alerts
+                GROUP BY organization, project, repository, state, alert_type, severity;
+            CREATE TRIGGER alert_counts_insert AFTER INSERT ON alerts BEGIN
+                INSERT INTO alert_counts
+                VALUES (new.organization, new.project, new.repository, new.state, new.alert_type, new.severity, 1)
+                ON CONFLICT DO UPDATE SET count = count + 1;
+            END;
+            ''' + cls._ALERT_COUNTS_UPDATE_TRIGGER + '''
+            CREATE TRIGGER alert_counts_delete AFTER DELETE ON alerts BEGIN
+                UPDATE alert_counts SET count = count - 1
+                WHERE organization = old.organization AND project = old.project AND repository = old.repository
+                    AND state = old.state AND alert_type = old.alert_type AND severity = old.severity;
+                DELETE FROM alert_counts
+                WHERE organization = old.organization AND project = old.project AND repository = old.repository
+                    AND state = old.state AND alert_type = old.alert_type AND severity = old.severity
+                    AND count <= 0;
+            END;
+            COMMIT;
+            ''')
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            logger.warning(f"Alert count summary unavailable, counts will scan alerts: {e}")
     
     def store_alert(self, alert: Alert, organization: str, project: str, repository: str) -> int:
         """
@@ -133,133 +483,101 @@ class AlertDatabase:
         Returns:
             int: Database ID of the stored alert
         """
-        now = datetime.now().isoformat()
+        return self.store_alerts([alert], organization, project, repository)[0]
+    
+    def store_alerts(self, alerts: List[Alert], organization: str, project: str, repository: str) -> List[int]:
+        """
+        Store a batch of alerts in a single transaction.
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        Each alert is a single upsert on (organization, project, repository,
+        alert_id) that returns its row id, with no lookup or branching in
+        Python; locations are then replaced with one executemany call each.
+        
+        Args:
+            alerts: The alerts to store
+            organization: Azure DevOps organization
+            project: Azure DevOps project
+            repository: Repository name or ID
             
-            # Check if alert already exists
-            cursor.execute(
-                'SELECT id FROM alerts WHERE organization = ? AND project = ? AND repository = ? AND alert_id = ?',
-                (organization, project, repository, alert.alert_id)
-            )
-            result = cursor.fetchone()
+        Returns:
+            List[int]: Database IDs of the stored alerts, in input order
+        """
+        if not alerts:
+            return []
+        
+        now = datetime.now(timezone.utc).isoformat()
+        
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            alert_db_ids = [
+                cursor.execute(
+                    self._UPSERT_ALERT, self._alert_row(alert, organization, project, repository, now)
+                ).fetchone()[0]
+                for alert in alerts
+            ]
             
-            # Convert alert to JSON-serializable format using custom encoder
-            alert_json = json.dumps(alert, cls=ComplexEncoder)
+            # A repeated alert keeps the locations of its last occurrence, as
+            # storing the alerts one at a time would
+            latest = dict(zip(alert_db_ids, alerts))
             
-            if result:
-                # Update existing alert
-                alert_db_id = result[0]
-                cursor.execute('''
-                UPDATE alerts SET
-                    alert_type = ?,
-                    confidence = ?,
-                    severity = ?,
-                    state = ?,
-                    first_seen_date = ?,
-                    last_seen_date = ?,
-                    git_ref = ?,
-                    introduced_date = ?,
-                    fixed_date = ?,
-                    rule_id = ?,
-                    rule_name = ?,
-                    tool_name = ?,
-                    dismissal_type = ?,
-                    dismissal_comment = ?,
-                    dismissal_by = ?,
-                    dismissal_at = ?,
-                    additional_properties = ?,
-                    raw_data = ?,
-                    updated_at = ?
-                WHERE id = ?
-                ''', (
-                    alert.alert_type.value,
-                    alert.confidence.value,
-                    alert.severity.value,
-                    alert.state.value,
-                    alert.first_seen_date.isoformat(),
-                    alert.last_seen_date.isoformat(),
-                    alert.git_ref,
-                    alert.introduced_date.isoformat() if alert.introduced_date else None,
-                    alert.fixed_date.isoformat() if alert.fixed_date else None,
-                    alert.rule.id if alert.rule else None,
-                    alert.rule.name if alert.rule else None,
-                    alert.tool.name if alert.tool else None,
-                    alert.dismissal.type if alert.dismissal else None,
-                    alert.dismissal.comment if alert.dismissal else None,
-                    alert.dismissal.dismissed_by if alert.dismissal else None,
-                    alert.dismissal.dismissed_at.isoformat() if alert.dismissal and alert.dismissal.dismissed_at else None,
-                    json.dumps(alert.additional_properties, cls=ComplexEncoder) if alert.additional_properties else None,
-                    alert_json,
-                    now,
-                    alert_db_id
-                ))
-                
-                # Delete existing locations
-                cursor.execute('DELETE FROM physical_locations WHERE alert_id = ?', (alert_db_id,))
-                cursor.execute('DELETE FROM logical_locations WHERE alert_id = ?', (alert_db_id,))
-            else:
-                # Insert new alert
-                cursor.execute('''
-                INSERT INTO alerts (
-                    alert_id, organization, project, repository,
-                    alert_type, confidence, severity, state,
-                    first_seen_date, last_seen_date, git_ref,
-                    introduced_date, fixed_date,
-                    rule_id, rule_name, tool_name,
-                    dismissal_type, dismissal_comment, dismissal_by, dismissal_at,
-                    additional_properties, raw_data,
-                    created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    alert.alert_id, organization, project, repository,
-                    alert.alert_type.value, alert.confidence.value, alert.severity.value, alert.state.value,
-                    alert.first_seen_date.isoformat(), alert.last_seen_date.isoformat(), alert.git_ref,
-                    alert.introduced_date.isoformat() if alert.introduced_date else None,
-                    alert.fixed_date.isoformat() if alert.fixed_date else None,
-                    alert.rule.id if alert.rule else None,
-                    alert.rule.name if alert.rule else None,
-                    alert.tool.name if alert.tool else None,
-                    alert.dismissal.type if alert.dismissal else None,
-                    alert.dismissal.comment if alert.dismissal else None,
-                    alert.dismissal.dismissed_by if alert.dismissal else None,
-                    alert.dismissal.dismissed_at.isoformat() if alert.dismissal and alert.dismissal.dismissed_at else None,
-                    json.dumps(alert.additional_properties, cls=ComplexEncoder) if alert.additional_properties else None,
-                    alert_json,
-                    now, now
-                ))
-                alert_db_id = cursor.lastrowid
+            # Replace existing locations
+            stored = [(alert_db_id,) for alert_db_id in latest]
+            cursor.executemany(self._DELETE_PHYSICAL_LOCATIONS, stored)
+            cursor.executemany(self._DELETE_LOGICAL_LOCATIONS, stored)
             
-            # Insert physical locations
-            for location in alert.physical_locations:
-                cursor.execute('''
-                INSERT INTO physical_locations (
-                    alert_id, file_path, start_line, end_line, start_column, end_column
-                ) VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
+            cursor.executemany(self._INSERT_PHYSICAL_LOCATION, [
+                (
                     alert_db_id,
                     location.file_path,
                     location.start_line,
                     location.end_line,
                     location.start_column,
                     location.end_column
-                ))
+                )
+                for alert_db_id, alert in latest.items()
+                for location in alert.physical_locations
+            ])
             
-            # Insert logical locations
-            for location in alert.logical_locations:
-                cursor.execute('''
-                INSERT INTO logical_locations (
-                    alert_id, name, kind
-                ) VALUES (?, ?, ?)
-                ''', (
-                    alert_db_id,
-                    location.name,
-                    location.kind
-                ))
+            cursor.executemany(self._INSERT_LOGICAL_LOCATION, [
+                (alert_db_id, location.name, location.kind)
+                for alert_db_id, alert in latest.items()
+                for location in alert.logical_locations
+            ])
+        
+        return alert_db_ids
+    
+    @staticmethod
+    def _alert_row(alert: Alert, organization: str, project: str, repository: str, now: str) -> tuple:
+        """
+        Build the parameters of _UPSERT_ALERT for an alert.
+        
+        Args:
+            alert: The alert to store
+            organization: Azure DevOps organization
+            project: Azure DevOps project
+            repository: Repository name or ID
+            now: Timestamp to record as the created/updated time
             
-            conn.commit()
-            return alert_db_id
+        Returns:
+            tuple: Values for the alerts table columns
+        """
+        return (
+            alert.alert_id, organization, project, repository,
+            alert.alert_type.value, alert.confidence.value, alert.severity.value, alert.state.value,
+            alert.first_seen_date.isoformat(), alert.last_seen_date.isoformat(), alert.git_ref,
+            alert.introduced_date.isoformat() if alert.introduced_date else None,
+            alert.fixed_date.isoformat() if alert.fixed_date else None,
+            alert.rule.id if alert.rule else None,
+            alert.rule.name if alert.rule else None,
+            alert.tool.name if alert.tool else None,
+            alert.dismissal.type if alert.dismissal else None,
+            alert.dismissal.comment if alert.dismissal else None,
+            alert.dismissal.dismissed_by if alert.dismissal else None,
+            alert.dismissal.dismissed_at.isoformat() if alert.dismissal and alert.dismissal.dismissed_at else None,
+            # Stored as the encoder's bytes, skipping a decode to str per alert
+            _dumps(alert),
+            now, now
+        )
     
     def get_alerts(self, organization: str, project: str, repository: Optional[str] = None, 
                   severity: Optional[List[str]] = None, state: Optional[List[str]] = None,
@@ -277,20 +595,36 @@ class AlertDatabase:
             limit: Maximum number of alerts to return
             
         Returns:
-            List[Dict]: List of alert dictionaries
+            List[Dict]: List of alert dictionaries, with raw_data decoded
+        """
+        return list(self.iter_alerts(organization, project, repository, severity, state, alert_type, limit))
+    
+    def iter_alerts(self, organization: str, project: str, repository: Optional[str] = None,
+                    severity: Optional[List[str]] = None, state: Optional[List[str]] = None,
+                    alert_type: Optional[str] = None, limit: int = 100) -> Iterator[Dict]:
+        """
+        Iterate over alerts from the database with optional filtering.
+        
+        Alerts are built one at a time as the cursor advances, so only the
+        alert being consumed is held in memory. The generator keeps the
+        database connection until it is exhausted or closed; a caller that
+        stops early should close it.
+        
+        Args:
+            organization: Azure DevOps organization
+            project: Azure DevOps project
+            repository: Optional repository name or ID
+            severity: Optional list of severities to filter by
+            state: Optional list of states to filter by
+            alert_type: Optional alert type to filter by
+            limit: Maximum number of alerts to return
+            
+        Yields:
+            Dict: Alert dictionary, with raw_data decoded
         """
-        query = '''
-        SELECT id, alert_id, organization, project, repository,
-               alert_type, confidence, severity, state,
-               first_seen_date, last_seen_date, git_ref,
-               introduced_date, fixed_date,
-               rule_id, rule_name, tool_name,
-               dismissal_type, dismissal_comment, dismissal_by, dismissal_at,
-               additional_properties, raw_data,
-               created_at, updated_at
-        FROM alerts
-        WHERE organization = ? AND project = ?
-        '''
+        # Equal filter combinations produce identical text, so SQLite's
+        # per-connection statement cache reuses the prepared statement
+        query = self._LIST_ALERTS
         params = [organization, project]
         
         if repository:
@@ -311,32 +645,20 @@ class AlertDatabase:
             query += ' AND alert_type = ?'
             params.append(alert_type)
         
-        query += ' ORDER BY last_seen_date DESC LIMIT ?'
+        query += ' ORDER BY last_seen_date DESC, id LIMIT ?'
         params.append(limit)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._transaction() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute(query, params)
             
-            alerts = []
-            for row in cursor.fetchall():
+            # Locations arrive aggregated as JSON arrays alongside each alert,
+            # rather than through two further queries per alert
+            for row in cursor:
                 alert_dict = dict(row)
-                
-                # Get physical locations
-                cursor.execute(
-                    'SELECT file_path, start_line, end_line, start_column, end_column FROM physical_locations WHERE alert_id = ?',
-                    (row['id'],)
-                )
-                alert_dict['physical_locations'] = [dict(loc) for loc in cursor.fetchall()]
-                
-                # Get logical locations
-                cursor.execute(
-                    'SELECT name, kind FROM logical_locations WHERE alert_id = ?',
-                    (row['id'],)
-                )
-                alert_dict['logical_locations'] = [dict(loc) for loc in cursor.fetchall()]
-                
-                alerts.append(alert_dict)
-            
-            return alerts
+                alert_dict['physical_locations'] = json.loads(alert_dict.pop('physical_locations_json'))
+                alert_dict['logical_locations'] = json.loads(alert_dict.pop('logical_locations_json'))
+                if alert_dict['raw_data']:
+                    alert_dict['raw_data'] = _loads(alert_dict['raw_data'])
+                yield alert_dict
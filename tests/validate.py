@@ -3,37 +3,132 @@ Validation script for the Azure DevOps Security Alert Agent.
 
 This script validates the agent's functionality by:
 1. Testing authentication
-2. Testing API connectivity
+2. Testing API connectivity and OAuth token handling
 3. Testing data collection
 4. Testing data storage
 5. Validating metadata extraction
+6. Checking the analyzer's summary and search tables against the alerts
 """
 
 import os
 import sys
+import argparse
 import logging
+import logging.handlers
 import json
+import base64
+import sqlite3
+import dataclasses
+import functools
+import operator
+import tempfile
+import time
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
 
-# Add parent directory to path to import modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add parent directory to path to import modules when run as a script;
+# importers such as tests.validate already have it on the path
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.auth.oauth import PersonalAccessTokenAuth
+from src.auth.oauth import OAuthAuthentication, PersonalAccessTokenAuth
 from src.api.client import AzureDevOpsClient
-from src.api.models import Alert
+from src.api.models import Alert, AlertState, PhysicalLocation, Severity
 from src.storage.database import AlertDatabase
+from src.analysis.query import AlertAnalyzer, _rows_as_dicts
 
-# Configure logging
+# Configure logging; records are buffered and written out together when the
+# run finishes (or straight away once an error is logged)
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.StreamHandler(sys.stdout)
+        logging.handlers.MemoryHandler(
+            capacity=1024,
+            flushLevel=logging.ERROR,
+            target=_stdout_handler
+        )
     ]
 )
 
 logger = logging.getLogger(__name__)
 
+# Basic header Azure DevOps expects for the mock PAT (empty user name)
+_EXPECTED_AUTH = "Basic " + base64.b64encode(b":mock_pat").decode()
+
+# Sample API response shared by the model, database and metadata checks,
+# read-only so parsing cannot change it between checks
+_SAMPLE_DATA = MappingProxyType({
+    "alertId": 12345,
+    "alertType": "code",
+    "confidence": "high",
+    "severity": "critical",
+    "state": "active",
+    "firstSeenDate": "2025-05-01T10:00:00Z",
+    "lastSeenDate": "2025-06-01T10:00:00Z",
+    "gitRef": "refs/heads/main",
+    "physicalLocations": (
+        MappingProxyType({
+            "filePath": "src/main.py",
+            "startLine": 10,
+            "endLine": 15
+        }),
+    ),
+    "logicalLocations": (
+        MappingProxyType({
+            "name": "main_function",
+            "kind": "function"
+        }),
+    ),
+    "rule": MappingProxyType({
+        "id": "rule-123",
+        "name": "Insecure Function",
+        "description": "This function has security issues"
+    })
+})
+
+# Values the sample response must parse into, in _ALERT_FIELDS order
+# followed by the location checks appended in _check_alert()
+_ALERT_FIELDS = operator.attrgetter(
+    "alert_id", "alert_type.value", "confidence.value", "severity.value",
+    "state.value", "git_ref", "rule.id"
+)
+_EXPECTED_ALERT = (
+    12345, "code", "high", "critical", "active", "refs/heads/main", "rule-123",
+    1, "src/main.py", 1, "main_function"
+)
+
+# Same alert fields, followed by the first location's span and the rule name
+_EXPECTED_METADATA = _EXPECTED_ALERT[:7] + ("src/main.py", 10, 15, "Insecure Function")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_sample_alert():
+    """Parse the sample API response once and reuse the resulting alert."""
+    return Alert.from_api(_SAMPLE_DATA)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_database():
+    """Open the in-memory alert store once and reuse its connection."""
+    return AlertDatabase(":memory:")
+
+
+def _check_alert(alert):
+    """Check that a parsed alert carries the sample response's values."""
+    physical, logical = alert.physical_locations, alert.logical_locations
+    if not physical or not logical:
+        return False
+    actual = _ALERT_FIELDS(alert) + (
+        len(physical), physical[0].file_path, len(logical), logical[0].name
+    )
+    return actual == _EXPECTED_ALERT
+
 
 def validate_authentication():
     """Test authentication with a mock PAT."""
@@ -44,7 +139,7 @@ def validate_authentication():
     headers = auth.get_auth_header()
     
     # Validate the headers
-    if "Authorization" in headers and headers["Authorization"].startswith("Basic "):
+    if headers.get("Authorization") == _EXPECTED_AUTH:
         logger.info("✓ Authentication header generation successful")
         return True
     else:
@@ -52,6 +147,56 @@ def validate_authentication():
         return False
 
 
+def validate_oauth_tokens():
+    """Test OAuth token reuse, refresh and error handling with a stubbed session."""
+    logger.info("Validating OAuth token handling...")
+    
+    auth = OAuthAuthentication("mock_client", "mock_secret", "mock_tenant")
+    auth._session.close()
+    
+    # Token endpoint responses, in the order the provider requests them
+    session = mock.Mock()
+    session.post.side_effect = [
+        mock.Mock(**{"json.return_value": body}) for body in (
+            {"access_token": "token-1", "expires_in": 3600},
+            {"access_token": "token-2", "expires_in": 3600},
+            {"error": "invalid_client", "error_description": "Invalid client secret"},
+        )
+    ]
+    auth._session = session
+    
+    # A valid token is reused, header included, without another request
+    first = auth.get_auth_header()
+    if (first != {"Authorization": "Bearer token-1"} or
+        auth.get_auth_header() is not first or session.post.call_count != 1):
+        logger.error("✗ OAuth token was not reused before expiry")
+        return False
+    
+    # Once past its deadline the token is refreshed
+    auth.token_expiry = time.monotonic() - 1
+    if (auth.get_auth_header() != {"Authorization": "Bearer token-2"} or
+        session.post.call_count != 2):
+        logger.error("✗ OAuth token was not refreshed after expiry")
+        return False
+    
+    # A response without a token is reported, not surfaced as a KeyError
+    auth.token_expiry = time.monotonic() - 1
+    try:
+        auth.get_token()
+        logger.error("✗ OAuth token response without access_token was accepted")
+        return False
+    except ValueError:
+        pass
+    
+    auth.close()
+    if not session.close.called:
+        logger.error("✗ OAuth token session was not closed")
+        return False
+    
+    logger.info("✓ OAuth token handling successful")
+    return True
+
+
 def validate_api_client():
     """Test API client initialization."""
     logger.info("Validating API client...")
@@ -81,174 +226,241 @@ def validate_data_models():
     """Test data model parsing from API response."""
     logger.info("Validating data models...")
     
-    # Sample API response
-    sample_data = {
-        "alertId": 12345,
-        "alertType": "code",
-        "confidence": "high",
-        "severity": "critical",
-        "state": "active",
-        "firstSeenDate": "2025-05-01T10:00:00Z",
-        "lastSeenDate": "2025-06-01T10:00:00Z",
-        "gitRef": "refs/heads/main",
-        "physicalLocations": [
-            {
-                "filePath": "src/main.py",
-                "startLine": 10,
-                "endLine": 15
-            }
-        ],
-        "logicalLocations": [
-            {
-                "name": "main_function",
-                "kind": "function"
-            }
-        ],
-        "rule": {
-            "id": "rule-123",
-            "name": "Insecure Function",
-            "description": "This function has security issues"
-        }
-    }
+    # Parse the sample data
+    alert = _get_sample_alert()
     
-    try:
-        # Parse the sample data
-        alert = Alert.from_api(sample_data)
-        
-        # Validate parsed data
-        if (alert.alert_id == 12345 and
-            alert.alert_type.value == "code" and
-            alert.confidence.value == "high" and
-            alert.severity.value == "critical" and
-            alert.state.value == "active" and
-            alert.git_ref == "refs/heads/main" and
-            len(alert.physical_locations) == 1 and
-            alert.physical_locations[0].file_path == "src/main.py" and
-            len(alert.logical_locations) == 1 and
-            alert.logical_locations[0].name == "main_function" and
-            alert.rule.id == "rule-123"):
-            logger.info("✓ Data model parsing successful")
-            return True, alert
-        else:
-            logger.error("✗ Data model parsing failed - incorrect values")
-            return False, None
-    except Exception as e:
-        logger.error(f"✗ Data model parsing failed with error: {e}")
+    # Validate parsed data
+    if _check_alert(alert):
+        logger.info("✓ Data model parsing successful")
+        return True, alert
+    else:
+        logger.error("✗ Data model parsing failed - incorrect values")
         return False, None
 
 
-def validate_database():
+def validate_database(alert, db=None):
     """Test database operations."""
     logger.info("Validating database operations...")
     
-    # Create a temporary database
-    db_path = "test_alerts.db"
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    # Without a parsed sample alert there is nothing to store
+    if alert is None:
+        return False
     
-    try:
-        # Initialize database
-        db = AlertDatabase(db_path)
-        
-        # Get a sample alert
-        success, alert = validate_data_models()
-        if not success:
-            return False
-        
-        # Store the alert
-        alert_id = db.store_alert(
-            alert=alert,
-            organization="test-org",
-            project="test-project",
-            repository="test-repo"
-        )
-        
-        if alert_id <= 0:
-            logger.error("✗ Alert storage failed")
-            return False
-        
-        # Retrieve the alert
-        alerts = db.get_alerts(
-            organization="test-org",
-            project="test-project",
-            repository="test-repo"
-        )
-        
-        if len(alerts) != 1 or alerts[0]["alert_id"] != 12345:
-            logger.error("✗ Alert retrieval failed")
-            return False
-        
-        logger.info("✓ Database operations successful")
-        return True
-    except Exception as e:
-        logger.error(f"✗ Database operations failed with error: {e}")
+    # Nothing here needs to outlive the check, so the shared store lives
+    # in memory; storing the same alert again just updates its row
+    if db is None:
+        db = _get_database()
+    
+    # Store the alert
+    alert_id = db.store_alert(
+        alert=alert,
+        organization="test-org",
+        project="test-project",
+        repository="test-repo"
+    )
+    
+    if alert_id <= 0:
+        logger.error("✗ Alert storage failed")
+        return False
+    
+    # Retrieve the alert
+    alerts = db.get_alerts(
+        organization="test-org",
+        project="test-project",
+        repository="test-repo"
+    )
+    
+    if len(alerts) != 1 or alerts[0]["alert_id"] != 12345:
+        logger.error("✗ Alert retrieval failed")
         return False
-    finally:
-        # Clean up
-        if os.path.exists(db_path):
-            os.remove(db_path)
+    
+    logger.info("✓ Database operations successful")
+    return True
 
 
-def validate_metadata_extraction():
+def validate_metadata_extraction(alert):
     """Test metadata extraction from alerts."""
     logger.info("Validating metadata extraction...")
     
-    # Get a sample alert
-    success, alert = validate_data_models()
-    if not success:
+    # Without a parsed sample alert there is nothing to inspect
+    if alert is None:
         return False
     
-    # Validate metadata extraction
-    try:
-        # Check core metadata
-        if (alert.severity.value == "critical" and
-            alert.alert_type.value == "code" and
-            alert.state.value == "active" and
-            alert.confidence.value == "high"):
+    # Check core, location and rule metadata in one comparison
+    if alert.physical_locations:
+        location = alert.physical_locations[0]
+        actual = _ALERT_FIELDS(alert) + (
+            location.file_path, location.start_line, location.end_line,
+            alert.rule.name
+        )
+        if actual == _EXPECTED_METADATA:
+            logger.info("✓ Metadata extraction successful")
+            return True
+    
+    logger.error("✗ Metadata extraction failed - incorrect values")
+    return False
+
+
+def validate_derived_tables(alert):
+    """Test that the analyzer's summary and search tables follow upserts."""
+    logger.info("Validating derived tables...")
+    
+    # Without a parsed sample alert there is nothing to store
+    if alert is None:
+        return False
+    
+    org, project, repository = "test-org", "test-project", "test-repo"
+    
+    # The analyzer opens the database by path, so this check needs a real file
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "alerts.db")
+        db = AlertDatabase(db_path)
+        analyzer = None
+        try:
+            db.store_alert(alert=alert, organization=org, project=project, repository=repository)
+            
+            # AlertDatabase created alert_counts, alerts_fts and their triggers;
+            # the analyzer only reads them
+            analyzer = AlertAnalyzer(db_path)
+            if not (analyzer._counts_available and analyzer._fts_available):
+                logger.error("✗ Derived tables missing from the alert store")
+                return False
             
-            # Check location metadata
-            if (len(alert.physical_locations) > 0 and
-                alert.physical_locations[0].file_path == "src/main.py" and
-                alert.physical_locations[0].start_line == 10 and
-                alert.physical_locations[0].end_line == 15):
-                
-                # Check rule metadata
-                if (alert.rule.id == "rule-123" and
-                    alert.rule.name == "Insecure Function"):
-                    
-                    logger.info("✓ Metadata extraction successful")
-                    return True
+            # Upsert the alert with a new severity, state and location, so the
+            # triggers have to move its count bucket and replace its file path,
+            # then add a second alert to the same bucket
+            updated = dataclasses.replace(
+                alert,
+                severity=Severity.LOW,
+                state=AlertState.FIXED,
+                physical_locations=[PhysicalLocation(file_path="src/other.py", start_line=1, end_line=2)]
+            )
+            db.store_alert(alert=updated, organization=org, project=project, repository=repository)
+            sibling = dataclasses.replace(updated, alert_id=alert.alert_id + 1)
+            db.store_alert(alert=sibling, organization=org, project=project, repository=repository)
+            
+            # Summary-table counts, alone and in the combined report, must match
+            # a GROUP BY over alerts
+            combined = analyzer.get_alert_counts(org, project)
+            for name, counts in (
+                ("state", analyzer.get_alert_counts_by_state(org, project)),
+                ("type", analyzer.get_alert_counts_by_type(org, project)),
+            ):
+                scan = analyzer._execute(AlertAnalyzer._QUERIES[f"{name}_scan"][False], [org, project])
+                scan = dict(scan.fetchall())
+                if counts != scan or combined[f"{name}_counts"] != scan:
+                    logger.error(f"✗ Alert {name} counts out of sync with alerts")
+                    return False
+            if analyzer.get_alert_counts_by_state(org, project) != {AlertState.FIXED.value: 2}:
+                logger.error("✗ Alert state counts did not follow the upsert")
+                return False
+            
+            # Full-text search must return the same rows as the LIKE fallback
+            for term, expected in (("src/other.py", 2), ("src/main.py", 0), ("Insecure", 2)):
+                found = analyzer.search_alerts(org, project, term)
+                like = analyzer._execute(
+                    AlertAnalyzer._QUERIES["search_like"][False],
+                    [org, project] + [f"%{term}%"] * 3 + [100]
+                )
+                if len(found) != expected or found != _rows_as_dicts(like):
+                    logger.error(f"✗ Alert search for '{term}' out of sync with alerts")
+                    return False
+            
+            # The external-content search indexes must agree with their tables;
+            # stale location entries would not show up in search results
+            try:
+                with db._transaction() as conn:
+                    for table in ("alerts_fts", "location_fts"):
+                        conn.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('integrity-check', 1)")
+            except sqlite3.DatabaseError as e:
+                logger.error(f"✗ Alert search index out of sync with alerts: {e}")
+                return False
+            
+            logger.info("✓ Derived tables in sync")
+            return True
+        finally:
+            if analyzer is not None:
+                analyzer.close()
+            db.close()
+
+
+# Checks run once the sample alert is parsed, in report order, each with
+# whether it takes that alert as its argument
+_TESTS = (
+    ("authentication", validate_authentication, False),
+    ("oauth_tokens", validate_oauth_tokens, False),
+    ("api_client", validate_api_client, False),
+    ("database", validate_database, True),
+    ("metadata_extraction", validate_metadata_extraction, True),
+    ("derived_tables", validate_derived_tables, True)
+)
+
+
+def _run_check(name, check, failed=False):
+    """
+    Run one validation check, treating an unexpected exception as a failure.
+    
+    Args:
+        name: Name of the check, for the log
+        check: Callable performing the check, or returning its result
+        failed: Value to return if the check raises
         
-        logger.error("✗ Metadata extraction failed - incorrect values")
-        return False
-    except Exception as e:
-        logger.error(f"✗ Metadata extraction failed with error: {e}")
-        return False
+    Returns:
+        The check's result, or failed if it raised
+    """
+    try:
+        return check()
+    except Exception:
+        logger.exception("✗ %s check failed with an error", name)
+        return failed
 
 
-def run_validation():
-    """Run all validation tests."""
+def run_validation(fail_fast=False):
+    """
+    Run all validation tests.
+    
+    Args:
+        fail_fast: Run the tests one at a time and stop at the first failure
+        
+    Returns:
+        True if every test that ran passed
+    """
     logger.info("Starting validation of Azure DevOps Security Alert Agent")
     
-    # Track validation results
-    results = {
-        "authentication": validate_authentication(),
-        "api_client": validate_api_client(),
-        "data_models": validate_data_models()[0],
-        "database": validate_database(),
-        "metadata_extraction": validate_metadata_extraction()
+    # Parse the sample alert up front; the database and metadata checks
+    # work on the same alert instead of parsing it again
+    data_models_passed, alert = _run_check(
+        "data_models", validate_data_models, failed=(False, None)
+    )
+    
+    checks = {
+        name: functools.partial(check, alert) if takes_alert else check
+        for name, check, takes_alert in _TESTS
     }
     
+    # Track validation results
+    results = {"data_models": data_models_passed}
+    if fail_fast:
+        if data_models_passed:
+            for name, check in checks.items():
+                results[name] = _run_check(name, check)
+                if not results[name]:
+                    break
+    else:
+        # The checks are independent, so run them side by side
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            futures = {name: executor.submit(check) for name, check in checks.items()}
+        results.update(
+            (name, _run_check(name, future.result)) for name, future in futures.items()
+        )
+    
     # Report results
     logger.info("\n=== Validation Results ===")
-    all_passed = True
     for test, passed in results.items():
         status = "PASSED" if passed else "FAILED"
-        logger.info(f"{test.ljust(20)}: {status}")
-        if not passed:
-            all_passed = False
+        logger.info(f"{test:<20}: {status}")
     
-    if all_passed:
+    if all(results.values()):
         logger.info("\n✓ All validation tests passed!")
         return True
     else:
@@ -257,5 +469,9 @@ def run_validation():
 
 
 if __name__ == "__main__":
-    success = run_validation()
+    parser = argparse.ArgumentParser(description='Validate the Azure DevOps Security Alert Agent')
+    parser.add_argument('--fast', action='store_true', help='Stop at the first failing test')
+    args = parser.parse_args()
+    
+    success = run_validation(fail_fast=args.fast)
     sys.exit(0 if success else 1)